@@ -6,24 +6,50 @@
 # Built for: 2-5 day development timeline, production-ready
 # ============================================================================
 
-import random
 import math
+import sys
 import json
 import logging
-from dataclasses import dataclass, asdict
+import logging.handlers
+from dataclasses import dataclass, asdict, field, replace
 from typing import List, Dict, Tuple, Optional
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
 from enum import Enum
 import heapq
+import itertools
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional: kernels fall back to plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+except ImportError:  # orjson is optional: reports fall back to the stdlib encoder
+    orjson = None
+
+def _encode_json(obj) -> bytes:
+    """Serialize to indented JSON; dataclass instances are encoded as dicts"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2, default=asdict).encode()
 
 # ============================================================================
 # CONFIGURATION PARAMETERS
 # ============================================================================
 
-@dataclass
+# Per-instance records drop their __dict__ where dataclasses support it (3.10+)
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_SLOTS)
 class SimulationConfig:
-    """Central configuration for DTN-LTP simulator"""
+    """Central configuration for DTN-LTP simulator (immutable, so hashable)"""
     # Network topology
     num_nodes: int = 8
     network_radius: float = 5000.0  # meters
@@ -46,6 +72,10 @@ class SimulationConfig:
     qos_priority_levels: int = 4
     max_hop_count: int = 10
     
+    # Routing
+    routing_protocol: str = "epidemic"  # A RouteProtocol value
+    spray_copies: int = 8  # Copies per new bundle under spray_and_wait
+    
     # Simulation timing
     simulation_time: float = 500.0  # seconds
     mobility_update_interval: float = 5.0
@@ -71,7 +101,9 @@ class QoSLevel(Enum):
     NORMAL = 2  # Standard
     LOW = 3  # Best effort
 
-@dataclass
+_QOS_LEVELS = list(QoSLevel)  # Indexed by QoSLevel.value
+
+@dataclass(**_SLOTS)
 class Bundle:
     """DTN Bundle (message unit)"""
     bundle_id: str
@@ -82,19 +114,19 @@ class Bundle:
     deadline: float  # absolute time
     qos_level: QoSLevel
     hop_count: int = 0
-    visit_history: List[int] = None
+    copies_left: int = 1  # Spray-and-Wait copy budget carried by this copy
+    qos_priority: int = field(init=False, repr=False)  # Cached qos_level.value
     
     def __post_init__(self):
-        if self.visit_history is None:
-            self.visit_history = []
+        self.qos_priority = self.qos_level.value
     
     def __lt__(self, other):
         """Priority queue ordering: critical first, then earliest deadline"""
-        if self.qos_level.value != other.qos_level.value:
-            return self.qos_level.value < other.qos_level.value
+        if self.qos_priority != other.qos_priority:
+            return self.qos_priority < other.qos_priority
         return self.deadline < other.deadline
 
-@dataclass
+@dataclass(**_SLOTS)
 class Contact:
     """Link contact: when two nodes can communicate"""
     node_a: int
@@ -107,7 +139,55 @@ class Contact:
     def duration(self) -> float:
         return self.end_time - self.start_time
 
-@dataclass
+class ContactTable:
+    """Contact schedule as parallel arrays (one entry per contact), sorted by start time"""
+    
+    def __init__(self, node_a=(), node_b=(), start_time=(), end_time=(),
+                 capacity=(), reliability=()):
+        order = np.argsort(np.asarray(start_time, dtype=float), kind='stable')
+        self.node_a = np.asarray(node_a, dtype=np.intp)[order]
+        self.node_b = np.asarray(node_b, dtype=np.intp)[order]
+        self.start_time = np.asarray(start_time, dtype=float)[order]
+        self.end_time = np.asarray(end_time, dtype=float)[order]
+        self.capacity = np.asarray(capacity, dtype=float)[order]  # Mbps
+        self.reliability = np.asarray(reliability, dtype=float)[order]  # 1 - error_rate
+    
+    @classmethod
+    def from_contacts(cls, contacts: List[Contact]) -> 'ContactTable':
+        return cls(
+            [c.node_a for c in contacts],
+            [c.node_b for c in contacts],
+            [c.start_time for c in contacts],
+            [c.end_time for c in contacts],
+            [c.capacity for c in contacts],
+            [c.reliability for c in contacts],
+        )
+    
+    def __len__(self) -> int:
+        return self.start_time.size
+    
+    def add(self, node_a: int, node_b: int, start_time: float, end_time: float,
+            capacity: float, reliability: float):
+        """Insert one contact, keeping start-time order"""
+        pos = int(np.searchsorted(self.start_time, start_time, side='right'))
+        self.node_a = np.insert(self.node_a, pos, node_a)
+        self.node_b = np.insert(self.node_b, pos, node_b)
+        self.start_time = np.insert(self.start_time, pos, start_time)
+        self.end_time = np.insert(self.end_time, pos, end_time)
+        self.capacity = np.insert(self.capacity, pos, capacity)
+        self.reliability = np.insert(self.reliability, pos, reliability)
+    
+    def involving(self, node_id: int) -> np.ndarray:
+        """Indices of the contacts node_id takes part in, in start order"""
+        return np.flatnonzero((self.node_a == node_id) | (self.node_b == node_id))
+    
+    def rows(self):
+        """Iterate (node_a, node_b, start, end, capacity, reliability) as Python scalars"""
+        return zip(self.node_a.tolist(), self.node_b.tolist(),
+                   self.start_time.tolist(), self.end_time.tolist(),
+                   self.capacity.tolist(), self.reliability.tolist())
+
+@dataclass(**_SLOTS)
 class NodeState:
     """State snapshot of a network node"""
     node_id: int
@@ -120,20 +200,82 @@ class NodeState:
     bundles_dropped: int
     avg_latency: float
 
+TICKS_PER_SECOND = 1_000_000  # Event clock resolution: 1 µs
+
+def _to_ticks(seconds: float) -> int:
+    """Seconds -> integer event-clock ticks"""
+    return round(seconds * TICKS_PER_SECOND)
+
+class Event:
+    """Scheduled simulator event: ordered by tick, then priority, then unique_id"""
+    __slots__ = ('tick', 'priority', 'unique_id', 'contact_idx', 'node_id', 'canceled')
+    
+    def __init__(self, tick: int, priority: int, unique_id: int,
+                 contact_idx: int = -1, node_id: int = -1):
+        # Integer microseconds: exact ties, replays and periodic steps, no float drift
+        self.tick = tick
+        self.priority = priority  # Event kind; lower runs first at equal times
+        self.unique_id = unique_id
+        self.contact_idx = contact_idx
+        self.node_id = node_id
+        self.canceled = False
+    
+    def __lt__(self, other):
+        # Field by field, so heap operations never build throwaway tuples
+        if self.tick != other.tick:
+            return self.tick < other.tick
+        if self.priority != other.priority:
+            return self.priority < other.priority
+        return self.unique_id < other.unique_id
+
 # ============================================================================
 # LTP PROTOCOL ENGINE
 # ============================================================================
 
+@dataclass(**_SLOTS)
 class LTPSegment:
     """LTP protocol segment"""
-    def __init__(self, segment_id: int, bundle_id: str, data: bytes, 
-                 is_eob: bool = False):
-        self.segment_id = segment_id
-        self.bundle_id = bundle_id
-        self.data = data
-        self.is_eob = is_eob  # End of Block
-        self.transmission_time = 0.0
-        self.retransmission_count = 0
+    segment_id: int
+    bundle_id: str
+    size: int  # bytes; payloads are simulated by size only
+    is_eob: bool = False  # End of Block
+    transmission_time: float = 0.0
+    retransmission_count: int = 0
+
+@njit(cache=True)
+def _rto_update(prev_rto: float, rtt: float, rto_initial: float,
+                first_time: bool) -> float:
+    """Next retransmission timeout, capped at 60 seconds"""
+    if first_time:
+        # Karn's algorithm: RTO = RTT * 2
+        rto = max(rto_initial, rtt * 2.0)
+    else:
+        # Exponential backoff on retransmission
+        rto = prev_rto * 1.5
+    return min(rto, 60.0)
+
+@njit(cache=True)
+def _simulate_ltp_transfer(sizes, seg_size, reliability, draws):
+    """Per-bundle delivery flags for a batch sent as LTP segments.
+    
+    Row k of draws holds the channel samples of the k-th segment overall, one
+    per attempt (first transmission plus retransmissions); a segment gets
+    through on its first sample below reliability.
+    """
+    delivered = np.ones(sizes.shape[0], dtype=np.bool_)
+    row = 0
+    for i in range(sizes.shape[0]):
+        num_segments = (sizes[i] + seg_size - 1) // seg_size
+        for _ in range(num_segments):
+            segment_ok = False
+            for sample in draws[row]:
+                if sample < reliability:
+                    segment_ok = True
+                    break
+            if not segment_ok:
+                delivered[i] = False
+            row += 1
+    return delivered
 
 class LTPEngine:
     """Implements Licklider Transmission Protocol for reliability"""
@@ -148,15 +290,15 @@ class LTPEngine:
     def segment_bundle(self, bundle: Bundle) -> List[LTPSegment]:
         """Fragment bundle into LTP segments"""
         segments = []
-        num_segments = (bundle.size + self.config.ltp_segment_size - 1) // self.config.ltp_segment_size
+        seg_size = self.config.ltp_segment_size
+        num_segments = (bundle.size + seg_size - 1) // seg_size
         
         for i in range(num_segments):
-            start = i * self.config.ltp_segment_size
-            end = min((i + 1) * self.config.ltp_segment_size, bundle.size)
-            data = bundle.size * bytes([i % 256])  # Symbolic data
+            start = i * seg_size
+            end = min((i + 1) * seg_size, bundle.size)
             is_eob = (i == num_segments - 1)
             
-            segment = LTPSegment(i, bundle.bundle_id, data, is_eob)
+            segment = LTPSegment(i, bundle.bundle_id, end - start, is_eob)
             segments.append(segment)
         
         self.pending_segments[bundle.bundle_id] = segments
@@ -168,14 +310,11 @@ class LTPEngine:
     
     def get_retransmission_timeout(self, bundle_id: str, rtt: float) -> float:
         """Calculate RTO using exponential backoff"""
-        if bundle_id not in self.rto_history:
-            # Karn's algorithm: RTO = RTT * 2
-            self.rto_history[bundle_id] = max(self.config.ltp_rto_initial, rtt * 2.0)
-        else:
-            # Exponential backoff on retransmission
-            self.rto_history[bundle_id] *= 1.5
-        
-        return min(self.rto_history[bundle_id], 60.0)  # Cap at 60 seconds
+        prev_rto = self.rto_history.get(bundle_id)
+        rto = _rto_update(0.0 if prev_rto is None else prev_rto, float(rtt),
+                          float(self.config.ltp_rto_initial), prev_rto is None)
+        self.rto_history[bundle_id] = rto
+        return rto
 
 # ============================================================================
 # DTN NODE IMPLEMENTATION
@@ -184,22 +323,38 @@ class LTPEngine:
 class DTNNode:
     """Delay/Disruption Tolerant Network Node"""
     
-    def __init__(self, node_id: int, config: SimulationConfig, x: float, y: float):
+    def __init__(self, node_id: int, config: SimulationConfig,
+                 positions: Tuple[np.ndarray, np.ndarray],
+                 network_stats: Optional[Dict[str, float]] = None):
         self.node_id = node_id
         self.config = config
-        self.x = x
-        self.y = y
+        self._positions = positions  # Simulator-wide (x, y) arrays, indexed by node_id
         
         # Buffer management
         self.bundle_buffer: Dict[str, Bundle] = {}
-        self.bundle_queue = []  # Priority queue for transmission
+        self.delivered_ids: set = set()  # Bundles delivered here
+        # Transmission priority queue of (qos_priority, deadline, seq, bundle_id)
+        self.bundle_queue: List[Tuple[int, float, int, str]] = []
+        # Per-QoS eviction heaps of (-deadline, seq, bundle_id); entries whose
+        # bundle has left the buffer are skipped lazily on pop
+        self._drop_heaps: List[list] = [[] for _ in QoSLevel]
+        self._heap_seq = itertools.count()
+        self.qos_counts = np.zeros(len(QoSLevel), dtype=np.int64)  # Buffered bundles per QoS
         
         # LTP engine for reliable transport
         self.ltp_engine = LTPEngine(node_id, config)
         
         # Routing knowledge
+        self._spray = (RouteProtocol(config.routing_protocol)
+                       is RouteProtocol.SPRAY_AND_WAIT)
         self.contact_schedule: List[Contact] = []
-        self.topology_knowledge: Dict[int, List[int]] = defaultdict(list)
+        self.topology_knowledge: Dict[int, set] = defaultdict(set)  # Known links (adjacency)
+        self.contact_cursor = 0  # Next entry in simulator.per_node_contacts
+        
+        # Shortest-path tree over known links (hop metric), repaired incrementally
+        self._spt: Dict[int, float] = {node_id: 0.0}
+        self._next_hop: Dict[int, int] = {}
+        self.topology_version = 0  # Bumped whenever a new link is learned
         
         # Statistics
         self.stats = {
@@ -210,23 +365,37 @@ class DTNNode:
             'delivery_count': 0,
             'spectrum_utilization': 0.0,
         }
+        # Running network-wide totals, shared by all nodes of a simulator
+        self.network_stats = (network_stats if network_stats is not None
+                              else DTNSimulator.new_network_stats())
         
         # Current contacts
         self.active_contacts: List[Contact] = []
     
+    @property
+    def _tombstones(self) -> int:
+        """Stale entries across bundle_queue and _drop_heaps (two per live bundle)"""
+        return (len(self.bundle_queue) + sum(map(len, self._drop_heaps))
+                - 2 * len(self.bundle_buffer))
+    
+    @property
+    def x(self) -> float:
+        return float(self._positions[0][self.node_id])
+    
+    @property
+    def y(self) -> float:
+        return float(self._positions[1][self.node_id])
+    
     def receive_bundle(self, bundle: Bundle, current_time: float):
         """Receive and store bundle"""
-        if bundle.bundle_id in self.bundle_buffer:
-            return  # Already have it
+        if bundle.bundle_id in self.bundle_buffer or bundle.bundle_id in self.delivered_ids:
+            return  # Already have it (or another copy was already delivered)
         
         # Check buffer capacity
         if len(self.bundle_buffer) >= self.config.max_buffer_size:
             # Drop lowest priority bundle
             self._drop_bundle()
         
-        bundle.visit_history.append(self.node_id)
-        self.bundle_buffer[bundle.bundle_id] = bundle
-        heapq.heappush(self.bundle_queue, bundle)
         self.stats['bundles_received'] += 1
         
         if bundle.destination_id == self.node_id:
@@ -234,52 +403,191 @@ class DTNNode:
             latency = current_time - bundle.creation_time
             self.stats['total_latency'] += latency
             self.stats['delivery_count'] += 1
-            del self.bundle_buffer[bundle.bundle_id]
+            self.network_stats['total_latency'] += latency
+            self.network_stats['delivery_count'] += 1
+            self.delivered_ids.add(bundle.bundle_id)
+            return
+        
+        self.bundle_buffer[bundle.bundle_id] = bundle
+        heapq.heappush(self.bundle_queue, (bundle.qos_priority, bundle.deadline,
+                                           next(self._heap_seq), bundle.bundle_id))
+        heapq.heappush(self._drop_heaps[bundle.qos_priority],
+                       (-bundle.deadline, next(self._heap_seq), bundle.bundle_id))
+        self.qos_counts[bundle.qos_priority] += 1
+        self.network_stats['buffered_bundles'] += 1
+        
+        # Every bundle leaves one stale entry behind in the heap it was not
+        # popped from; rebuild once stale entries outnumber live ones
+        if self._tombstones > 2 * len(self.bundle_buffer):
+            self._compact_heaps()
     
-    def _drop_bundle(self):
-        """Drop lowest priority bundle when buffer full"""
-        if not self.bundle_queue:
+    def receive_bundle_batch(self, bundles: List[Bundle], current_time: float):
+        """Receive and store many bundles at once
+        
+        Overflow is resolved by one eviction pass after the whole batch is
+        stored, so the new bundles compete with the buffered ones for space.
+        """
+        fresh: Dict[str, Bundle] = {}
+        for bundle in bundles:
+            if (bundle.bundle_id not in self.bundle_buffer and
+                    bundle.bundle_id not in self.delivered_ids):
+                fresh.setdefault(bundle.bundle_id, bundle)
+        if not fresh:
             return
+        self.stats['bundles_received'] += len(fresh)
         
-        # Find lowest priority bundle (non-critical, latest deadline)
-        candidates = [b for b in self.bundle_queue 
-                     if b.qos_level != QoSLevel.CRITICAL]
-        if candidates:
-            bundle = max(candidates, key=lambda b: b.deadline)
-            self.bundle_buffer.pop(bundle.bundle_id, None)
-            self.bundle_queue.remove(bundle)
-            heapq.heapify(self.bundle_queue)
-            self.stats['bundles_dropped'] += 1
+        stored = []
+        for bundle in fresh.values():
+            if bundle.destination_id == self.node_id:
+                # Final destination reached
+                latency = current_time - bundle.creation_time
+                self.stats['total_latency'] += latency
+                self.stats['delivery_count'] += 1
+                self.network_stats['total_latency'] += latency
+                self.network_stats['delivery_count'] += 1
+                self.delivered_ids.add(bundle.bundle_id)
+            else:
+                stored.append(bundle)
+        if not stored:
+            return
+        
+        self.bundle_buffer.update((b.bundle_id, b) for b in stored)
+        for bundle in stored:
+            self.bundle_queue.append((bundle.qos_priority, bundle.deadline,
+                                      next(self._heap_seq), bundle.bundle_id))
+            self._drop_heaps[bundle.qos_priority].append(
+                (-bundle.deadline, next(self._heap_seq), bundle.bundle_id))
+        heapq.heapify(self.bundle_queue)
+        for heap in self._drop_heaps:
+            heapq.heapify(heap)
+        qos = np.fromiter((b.qos_priority for b in stored), dtype=np.intp, count=len(stored))
+        self.qos_counts += np.bincount(qos, minlength=len(QoSLevel))
+        self.network_stats['buffered_bundles'] += len(stored)
+        
+        overflow = len(self.bundle_buffer) - self.config.max_buffer_size
+        while overflow > 0 and self._drop_bundle():
+            overflow -= 1
+        
+        if self._tombstones > 2 * len(self.bundle_buffer):
+            self._compact_heaps()
+    
+    def _drop_bundle(self) -> bool:
+        """Drop lowest priority bundle when buffer full; False if none can go"""
+        # Lowest-priority level that holds a live bundle; CRITICAL is never dropped
+        droppable = np.flatnonzero(self.qos_counts[QoSLevel.CRITICAL.value + 1:])
+        if droppable.size == 0:
+            return False
+        level = int(droppable[-1]) + QoSLevel.CRITICAL.value + 1
+        
+        # qos_counts is exact, so this heap still holds a live entry
+        heap = self._drop_heaps[level]
+        while True:
+            _, _, bundle_id = heapq.heappop(heap)
+            if self.bundle_buffer.pop(bundle_id, None) is not None:
+                break
+        self.qos_counts[level] -= 1
+        self.stats['bundles_dropped'] += 1
+        self.network_stats['bundles_dropped'] += 1
+        self.network_stats['buffered_bundles'] -= 1
+        return True
+    
+    def _compact_heaps(self):
+        """Rebuild the transmission and eviction heaps from live bundles only"""
+        buffer = self.bundle_buffer
+        self.bundle_queue = [entry for entry in self.bundle_queue if entry[3] in buffer]
+        heapq.heapify(self.bundle_queue)
+        for heap in self._drop_heaps:
+            heap[:] = [entry for entry in heap if entry[2] in buffer]
+            heapq.heapify(heap)
     
     def select_bundles_for_transmission(self, peer: 'DTNNode', 
-                                       contact: Contact) -> List[Bundle]:
+                                       capacity: float) -> List[Bundle]:
         """Select bundles to transmit based on QoS and routing"""
         selected = []
-        available_bandwidth = contact.capacity  # Mbps
+        held = []  # Critical bundles waiting for their next hop
+        available_bandwidth = capacity  # Mbps
         
         while self.bundle_queue and available_bandwidth > 0:
-            bundle = heapq.heappop(self.bundle_queue)
+            entry = heapq.heappop(self.bundle_queue)
+            bundle = self.bundle_buffer.get(entry[3])
+            if bundle is None:
+                continue  # Dropped since it was queued
             
-            # Skip if already delivered to this peer
-            if bundle.destination_id == peer.node_id:
-                selected.append(bundle)
-                available_bandwidth -= (bundle.size / 8.0) / 1000.0  # Convert to Mbps usage
-            elif bundle.hop_count < self.config.max_hop_count:
-                # Forward to peer
+            # Critical bundles follow the known shortest path when there is one
+            if (bundle.qos_level == QoSLevel.CRITICAL and
+                    bundle.destination_id != peer.node_id):
+                next_hop = self.get_next_hop(bundle.destination_id)
+                if next_hop is not None and next_hop != peer.node_id:
+                    held.append(entry)
+                    continue
+            
+            # Spray-and-Wait: with a single copy left, wait for the destination
+            spray = self._spray and bundle.destination_id != peer.node_id
+            if spray and bundle.copies_left <= 1:
+                held.append(entry)
+                continue
+            
+            # Deliver to peer directly, or forward while under the hop limit
+            if (bundle.destination_id == peer.node_id or
+                    bundle.hop_count < self.config.max_hop_count):
+                cost = bundle.size * 1.25e-4  # bytes -> Mbps usage, (size / 8) / 1000
+                if cost > available_bandwidth:
+                    # Not enough capacity left in this contact; keep it queued
+                    heapq.heappush(self.bundle_queue, entry)
+                    break
+                available_bandwidth -= cost
+                
+                if spray:
+                    # Binary spray: hand over half of the copies, keep the rest
+                    give = bundle.copies_left // 2
+                    bundle.copies_left -= give
+                    selected.append(replace(bundle, copies_left=give))
+                    held.append(entry)
+                    continue
                 selected.append(bundle)
-                available_bandwidth -= (bundle.size / 8.0) / 1000.0
             
-            if bundle.bundle_id in self.bundle_buffer:
-                del self.bundle_buffer[bundle.bundle_id]
+            del self.bundle_buffer[bundle.bundle_id]
+            self.qos_counts[bundle.qos_priority] -= 1
+            self.network_stats['buffered_bundles'] -= 1
+        
+        for entry in held:
+            heapq.heappush(self.bundle_queue, entry)
         
         return selected
     
     def update_topology_knowledge(self, other_node: 'DTNNode'):
         """Exchange routing information with peer (routing gossip)"""
-        # Epidemic routing: share all known routes
-        self.topology_knowledge[other_node.node_id].extend(
-            other_node.topology_knowledge.get(other_node.node_id, [])
-        )
+        # Epidemic routing: learn the direct link, then every link the peer knows
+        self._add_link(self.node_id, other_node.node_id)
+        for u, neighbors in list(other_node.topology_knowledge.items()):
+            for v in neighbors - self.topology_knowledge[u]:
+                self._add_link(u, v)
+    
+    def _add_link(self, u: int, v: int):
+        """Record link u <-> v and repair the shortest-path tree"""
+        if v in self.topology_knowledge[u]:
+            return
+        self.topology_knowledge[u].add(v)
+        self.topology_knowledge[v].add(u)
+        self.topology_version += 1
+        
+        # Links are only ever added, so only nodes whose distance shrinks
+        # through the new link (and their descendants) are re-relaxed
+        pending = deque([(u, v), (v, u)])
+        while pending:
+            a, b = pending.popleft()
+            if a not in self._spt:
+                continue
+            dist = self._spt[a] + 1.0
+            if dist >= self._spt.get(b, math.inf):
+                continue
+            self._spt[b] = dist
+            self._next_hop[b] = b if a == self.node_id else self._next_hop[a]
+            pending.extend((b, w) for w in self.topology_knowledge[b])
+    
+    def get_next_hop(self, destination_id: int) -> Optional[int]:
+        """Next hop towards destination on the known shortest path, if any"""
+        return self._next_hop.get(destination_id)
     
     def get_statistics(self, current_time: float) -> NodeState:
         """Collect current node statistics"""
@@ -305,19 +613,61 @@ class DTNNode:
 class DTNSimulator:
     """Main DTN-LTP Network Simulator"""
     
+    # Event kinds, in the order they run within one timestamp: transfers
+    # complete before metrics sample them and before new traffic is injected
+    CONTACT_EVENT = 0
+    METRICS_EVENT = 1
+    TRAFFIC_EVENT = 2
+    
+    METRICS_INTERVAL = 100 * TICKS_PER_SECOND
+    TRAFFIC_INTERVAL = 50 * TICKS_PER_SECOND
+    
+    BER_CHUNK = 1 << 16  # LTP loss draws generated per refill
+    
+    # Columns of the metrics history
+    METRICS_COLUMNS = (
+        ('timestamp', float),
+        ('total_delivered', np.int64),
+        ('total_transmitted', np.int64),
+        ('total_dropped', np.int64),
+        ('avg_latency', float),
+        ('delivery_ratio', float),
+        ('avg_buffer_utilization', float),
+    )
+    
     def __init__(self, config: SimulationConfig):
         self.config = config
         self.current_time = 0.0
         self.nodes: List[DTNNode] = []
-        self.contacts: List[Contact] = []
-        self.events: List[Tuple[float, str, dict]] = []  # (time, event_type, data)
-        self.metrics_log: List[Dict] = []
+        self.contact_table = ContactTable()
+        self.per_node_contacts: List[np.ndarray] = []  # Built from contact_table by run()
+        # Topology versions of each node pair right after their last gossip
+        self._gossip_seen: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._bundle_seq = itertools.count()  # Keeps generated bundle ids unique
+        self.events: List[Event] = []  # Min-heap of pending events
+        self._event_seq = itertools.count()
+        self._canceled_count = 0  # Canceled events still sitting in the heap
+        self._dispatched = np.zeros(0, dtype=bool)  # Per contact: already processed
+        self._start_ticks = np.zeros(0, dtype=np.int64)  # Per contact: start on the event clock
+        self._pending_contacts: Dict[int, List[Event]] = {}  # Queued events per contact
+        
+        # Running totals kept up to date by the nodes, and columnar metrics history
+        self.network_stats = self.new_network_stats()
+        capacity = int(config.simulation_time / 100) + 8
+        self._metrics = {name: np.zeros(capacity, dtype=dtype)
+                         for name, dtype in self.METRICS_COLUMNS}
+        self._metrics_idx = 0
         
         # Configure logging
         self.setup_logging()
         
-        # Initialize RNG
-        random.seed(config.random_seed)
+        # Initialize RNG; LTP loss draws come from their own child stream,
+        # pre-drawn in chunks and consumed through a rolling index
+        seed_seq = np.random.SeedSequence(config.random_seed)
+        self.rng = np.random.default_rng(seed_seq)
+        self._ber_rng = np.random.default_rng(seed_seq.spawn(1)[0])
+        self._ber_samples = self._ber_rng.random(self.BER_CHUNK)
+        self._ber_idx = 0
         
         # Create network
         self._initialize_network()
@@ -328,7 +678,9 @@ class DTNSimulator:
             level=logging.INFO,
             format='%(asctime)s [%(levelname)s] %(message)s',
             handlers=[
-                logging.FileHandler('dtn_simulator.log'),
+                # Buffer file writes; flushed every 1000 records and after each run
+                logging.handlers.MemoryHandler(
+                    capacity=1000, target=logging.FileHandler('dtn_simulator.log')),
                 logging.StreamHandler()
             ]
         )
@@ -341,12 +693,12 @@ class DTNSimulator:
         """Create network nodes with random positions"""
         self.logger.info(f"Creating {self.config.num_nodes} DTN nodes...")
         
+        angles = np.linspace(0, 2 * np.pi, self.config.num_nodes, endpoint=False)
+        self.node_x = self.config.network_radius * np.cos(angles)
+        self.node_y = self.config.network_radius * np.sin(angles)
+        
         for i in range(self.config.num_nodes):
-            angle = (2 * math.pi * i) / self.config.num_nodes
-            x = self.config.network_radius * math.cos(angle)
-            y = self.config.network_radius * math.sin(angle)
-            
-            node = DTNNode(i, self.config, x, y)
+            node = DTNNode(i, self.config, (self.node_x, self.node_y), self.network_stats)
             self.nodes.append(node)
         
         # Generate realistic contact schedule (space/intermittent networks)
@@ -356,44 +708,56 @@ class DTNSimulator:
         """Generate contact schedule for nodes (orbital/intermittent pattern)"""
         self.logger.info("Generating contact schedule...")
         
-        for i in range(self.config.num_nodes):
-            for j in range(i + 1, self.config.num_nodes):
-                # Stochastic contact generation
-                contact_probability = 0.6
-                
-                if random.random() < contact_probability:
-                    # Create multiple contacts over simulation time
-                    num_contacts = random.randint(2, 5)
-                    
-                    for _ in range(num_contacts):
-                        start_time = random.uniform(0, self.config.simulation_time * 0.7)
-                        duration = random.uniform(self.config.min_contact_duration, 60.0)
-                        end_time = min(start_time + duration, self.config.simulation_time)
-                        
-                        # Simulate channel conditions
-                        capacity = self.config.channel_capacity * random.uniform(0.5, 1.0)
-                        error_rate = self.config.base_error_rate * random.uniform(0.5, 3.0)
-                        reliability = 1.0 - error_rate
-                        
-                        contact = Contact(i, j, start_time, end_time, capacity, reliability)
-                        self.contacts.append(contact)
+        # Stochastic contact generation, drawn for all node pairs at once
+        contact_probability = 0.6
+        pair_a, pair_b = np.triu_indices(self.config.num_nodes, k=1)
+        in_contact = self.rng.random(pair_a.size) < contact_probability
+        
+        # Create multiple contacts over simulation time
+        num_contacts = self.rng.integers(2, 6, size=int(in_contact.sum()))
+        node_a = np.repeat(pair_a[in_contact], num_contacts)
+        node_b = np.repeat(pair_b[in_contact], num_contacts)
+        total = node_a.size
+        
+        start_time = self.rng.uniform(0, self.config.simulation_time * 0.7, total)
+        duration = self.rng.uniform(self.config.min_contact_duration, 60.0, total)
+        end_time = np.minimum(start_time + duration, self.config.simulation_time)
+        
+        # Simulate channel conditions
+        capacity = self.config.channel_capacity * self.rng.uniform(0.5, 1.0, total)
+        error_rate = self.config.base_error_rate * self.rng.uniform(0.5, 3.0, total)
+        reliability = 1.0 - error_rate
+        
+        self.contact_table = ContactTable(node_a, node_b, start_time, end_time,
+                                          capacity, reliability)
+    
+    @property
+    def contacts(self) -> List[Contact]:
+        """Contact schedule as Contact records (built from contact_table)"""
+        return [Contact(*row) for row in self.contact_table.rows()]
+    
+    @contacts.setter
+    def contacts(self, contacts: List[Contact]):
+        self.contact_table = ContactTable.from_contacts(contacts)
     
     def generate_traffic(self):
         """Inject bundles into network"""
-        num_bundles = random.randint(20, 30)
+        num_nodes = self.config.num_nodes
+        num_bundles = int(self.rng.integers(20, 31))
         self.logger.info(f"Generating {num_bundles} bundles...")
         
-        for bundle_num in range(num_bundles):
-            source = random.randint(0, self.config.num_nodes - 1)
-            destination = random.randint(0, self.config.num_nodes - 1)
-            
-            if source == destination:
-                destination = (destination + 1) % self.config.num_nodes
-            
-            size = random.randint(512, 4096)  # bytes
-            qos_level = random.choice(list(QoSLevel))
-            deadline = self.current_time + random.uniform(50, 300)
-            
+        # Draw all bundle attributes up front
+        sources = self.rng.integers(0, num_nodes, num_bundles)
+        destinations = self.rng.integers(0, num_nodes, num_bundles)
+        destinations = np.where(destinations == sources,
+                                (destinations + 1) % num_nodes, destinations)
+        sizes = self.rng.integers(512, 4097, num_bundles)  # bytes
+        qos_idx = self.rng.integers(0, len(_QOS_LEVELS), num_bundles)
+        deadlines = self.current_time + self.rng.uniform(50, 300, num_bundles)
+        
+        for bundle_num, source, destination, size, qos, deadline in zip(
+                self._bundle_seq, sources.tolist(), destinations.tolist(), sizes.tolist(),
+                qos_idx.tolist(), deadlines.tolist()):
             bundle_id = f"bundle_{self.current_time:.2f}_{bundle_num}"
             bundle = Bundle(
                 bundle_id=bundle_id,
@@ -402,102 +766,211 @@ class DTNSimulator:
                 size=size,
                 creation_time=self.current_time,
                 deadline=deadline,
-                qos_level=qos_level
+                qos_level=_QOS_LEVELS[qos],
+                copies_left=self.config.spray_copies
             )
             
             # Inject at source
             self.nodes[source].receive_bundle(bundle, self.current_time)
     
-    def process_contact(self, contact: Contact):
-        """Simulate bundle transmission during contact"""
-        node_a = self.nodes[contact.node_a]
-        node_b = self.nodes[contact.node_b]
+    def process_contact(self, idx: int):
+        """Simulate bundle transmission during contact idx"""
+        table = self.contact_table
+        node_a = self.nodes[table.node_a[idx]]
+        node_b = self.nodes[table.node_b[idx]]
+        capacity = float(table.capacity[idx])
+        reliability = float(table.reliability[idx])
         
         # Select bundles for transmission (bidirectional)
-        bundles_ab = node_a.select_bundles_for_transmission(node_b, contact)
-        bundles_ba = node_b.select_bundles_for_transmission(node_a, contact)
+        bundles_ab = node_a.select_bundles_for_transmission(node_b, capacity)
+        bundles_ba = node_b.select_bundles_for_transmission(node_a, capacity)
+        
+        # Simulate LTP transmission: lost segments are retransmitted
+        delivered_ab = self._ltp_transfer(bundles_ab, reliability)
+        delivered_ba = self._ltp_transfer(bundles_ba, reliability)
         
-        # Simulate LTP transmission with potential packet loss
-        for bundle in bundles_ab:
-            if random.random() < contact.reliability:
+        for bundle, delivered in zip(bundles_ab, delivered_ab):
+            if delivered:
                 node_b.receive_bundle(bundle, self.current_time)
                 node_a.stats['bundles_transmitted'] += 1
+                self.network_stats['bundles_transmitted'] += 1
             else:
-                # Packet lost - would be retransmitted in real protocol
+                # A segment ran out of LTP retransmissions
                 node_a.stats['bundles_dropped'] += 1
+                self.network_stats['bundles_dropped'] += 1
         
-        for bundle in bundles_ba:
-            if random.random() < contact.reliability:
+        for bundle, delivered in zip(bundles_ba, delivered_ba):
+            if delivered:
                 node_a.receive_bundle(bundle, self.current_time)
                 node_b.stats['bundles_transmitted'] += 1
+                self.network_stats['bundles_transmitted'] += 1
             else:
                 node_b.stats['bundles_dropped'] += 1
+                self.network_stats['bundles_dropped'] += 1
         
-        # Exchange topology knowledge (routing gossip)
-        node_a.update_topology_knowledge(node_b)
-        node_b.update_topology_knowledge(node_a)
+        # Exchange topology knowledge (routing gossip). Afterwards both sides
+        # know the same links, so skip it if neither learned anything since.
+        pair = (node_a.node_id, node_b.node_id)
+        if self._gossip_seen.get(pair) != (node_a.topology_version, node_b.topology_version):
+            node_a.update_topology_knowledge(node_b)
+            node_b.update_topology_knowledge(node_a)
+            self._gossip_seen[pair] = (node_a.topology_version, node_b.topology_version)
+    
+    def _ltp_transfer(self, bundles: List[Bundle], reliability: float) -> List[bool]:
+        """Send bundles over LTP; True where every segment got through"""
+        seg_size = self.config.ltp_segment_size
+        sizes = np.fromiter((b.size for b in bundles), dtype=np.int64, count=len(bundles))
+        num_segments = int(((sizes + seg_size - 1) // seg_size).sum())
+        attempts = self.config.ltp_max_retransmissions + 1
+        draws = self._take_ber_samples(num_segments * attempts).reshape(num_segments, attempts)
+        return _simulate_ltp_transfer(sizes, seg_size, reliability, draws).tolist()
+    
+    def _take_ber_samples(self, n: int) -> np.ndarray:
+        """Next n uniform draws from the pre-drawn LTP loss stream"""
+        if self._ber_idx + n > self._ber_samples.size:
+            self._ber_samples = self._ber_rng.random(max(self.BER_CHUNK, n))
+            self._ber_idx = 0
+        start = self._ber_idx
+        self._ber_idx += n
+        return self._ber_samples[start:self._ber_idx]
     
     def run(self):
-        """Execute main simulation loop"""
+        """Execute main simulation loop (discrete-event)"""
         self.logger.info("Starting simulation...")
         
         # Initial traffic injection
         self.generate_traffic()
         
-        # Get sorted events (contact times)
-        sorted_contacts = sorted(self.contacts, key=lambda c: c.start_time)
-        contact_idx = 0
+        # Event heap: each node keeps only its next contact queued, and
+        # periodic events re-schedule themselves
+        self.events = [Event(0, self.METRICS_EVENT, next(self._event_seq)),
+                       Event(0, self.TRAFFIC_EVENT, next(self._event_seq))]
+        self._canceled_count = 0
+        table = self.contact_table
+        self.per_node_contacts = [table.involving(node.node_id) for node in self.nodes]
+        self._dispatched = np.zeros(len(table), dtype=bool)
+        self._start_ticks = np.rint(table.start_time * TICKS_PER_SECOND).astype(np.int64)
+        self._pending_contacts = {}
+        for node in self.nodes:
+            node.contact_cursor = 0
+            self._schedule_next_contact(node)
+        heapq.heapify(self.events)
+        end_tick = _to_ticks(self.config.simulation_time)
         
-        while self.current_time < self.config.simulation_time:
-            # Process contacts that start now
-            while (contact_idx < len(sorted_contacts) and 
-                   sorted_contacts[contact_idx].start_time <= self.current_time):
-                contact = sorted_contacts[contact_idx]
-                
-                if contact.end_time > self.current_time:
-                    self.process_contact(contact)
-                    self.logger.info(
-                        f"Contact: Node {contact.node_a} <-> {contact.node_b} "
-                        f"at t={self.current_time:.2f}s"
-                    )
+        while True:
+            event = self._pop_event()
+            if event is None or event.tick >= end_tick:
+                break
+            self.current_time = event.tick / TICKS_PER_SECOND
+            kind, idx = event.priority, event.contact_idx
+            
+            if kind == self.CONTACT_EVENT:
+                self._schedule_next_contact(self.nodes[event.node_id])
+                self._dispatched[idx] = True
+                # The other endpoint may have queued the same contact: retire
+                # its event and let that node move on to its next contact
+                for twin in self._pending_contacts.pop(idx):
+                    if twin is not event:
+                        self.cancel_event(twin)
+                        self._schedule_next_contact(self.nodes[twin.node_id])
                 
-                contact_idx += 1
+                if table.end_time[idx] > self.current_time:
+                    self.process_contact(idx)
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("Contact: Node %d <-> %d at t=%.2fs",
+                                          table.node_a[idx], table.node_b[idx],
+                                          self.current_time)
             
-            # Periodic statistics collection
-            if int(self.current_time) % 100 == 0:
+            elif kind == self.METRICS_EVENT:
+                # Periodic statistics collection
                 self._collect_metrics()
+                heapq.heappush(self.events, Event(event.tick + self.METRICS_INTERVAL, kind,
+                                                  next(self._event_seq)))
             
-            # Generate additional traffic periodically
-            if int(self.current_time) % 50 == 0:
+            else:
+                # Generate additional traffic periodically
                 self.generate_traffic()
-            
-            # Step forward in time
-            self.current_time += self.config.mobility_update_interval
+                heapq.heappush(self.events, Event(event.tick + self.TRAFFIC_INTERVAL, kind,
+                                                  next(self._event_seq)))
         
+        self.current_time = self.config.simulation_time
         self.logger.info("Simulation complete")
         self._finalize_metrics()
     
+    def _schedule_next_contact(self, node: DTNNode):
+        """Queue the next unprocessed contact from node's own schedule"""
+        schedule = self.per_node_contacts[node.node_id]
+        while node.contact_cursor < schedule.size:
+            idx = int(schedule[node.contact_cursor])
+            node.contact_cursor += 1
+            if self._dispatched[idx]:
+                continue  # Already processed via the other endpoint
+            event = Event(int(self._start_ticks[idx]), self.CONTACT_EVENT,
+                          next(self._event_seq), idx, node.node_id)
+            heapq.heappush(self.events, event)
+            self._pending_contacts.setdefault(idx, []).append(event)
+            return
+    
+    def cancel_event(self, event: Event):
+        """Mark a queued event as canceled; it is discarded when popped"""
+        if not event.canceled:
+            event.canceled = True
+            self._canceled_count += 1
+    
+    def _pop_event(self) -> Optional[Event]:
+        """Pop the earliest live event, compacting the heap once it is mostly canceled"""
+        while self.events:
+            event = heapq.heappop(self.events)
+            if not event.canceled:
+                return event
+            self._canceled_count -= 1
+            if self._canceled_count > len(self.events) // 2:
+                self.events[:] = [e for e in self.events if not e.canceled]
+                heapq.heapify(self.events)
+                self._canceled_count = 0
+        return None
+    
+    @staticmethod
+    def new_network_stats() -> Dict[str, float]:
+        """Zeroed network-wide running totals"""
+        return {
+            'bundles_transmitted': 0,
+            'bundles_dropped': 0,
+            'total_latency': 0.0,
+            'delivery_count': 0,
+            'buffered_bundles': 0,
+        }
+    
     def _collect_metrics(self):
         """Collect network-wide metrics"""
-        total_delivered = sum(n.stats['delivery_count'] for n in self.nodes)
-        total_transmitted = sum(n.stats['bundles_transmitted'] for n in self.nodes)
-        total_dropped = sum(n.stats['bundles_dropped'] for n in self.nodes)
+        totals = self.network_stats
+        total_delivered = totals['delivery_count']
+        total_transmitted = totals['bundles_transmitted']
         
-        avg_latency = (
-            sum(n.stats['total_latency'] for n in self.nodes) / max(total_delivered, 1)
+        row = (
+            self.current_time,
+            total_delivered,
+            total_transmitted,
+            totals['bundles_dropped'],
+            totals['total_latency'] / max(total_delivered, 1),
+            total_delivered / max(total_transmitted, 1),
+            totals['buffered_bundles'] / len(self.nodes),
         )
         
-        metrics = {
-            'timestamp': self.current_time,
-            'total_delivered': total_delivered,
-            'total_transmitted': total_transmitted,
-            'total_dropped': total_dropped,
-            'avg_latency': avg_latency,
-            'delivery_ratio': total_delivered / max(total_transmitted, 1),
-            'avg_buffer_utilization': sum(len(n.bundle_buffer) for n in self.nodes) / len(self.nodes),
-        }
-        
-        self.metrics_log.append(metrics)
+        if self._metrics_idx == len(self._metrics['timestamp']):
+            for name, column in self._metrics.items():
+                self._metrics[name] = np.resize(column, 2 * len(column))
+        for (name, _), value in zip(self.METRICS_COLUMNS, row):
+            self._metrics[name][self._metrics_idx] = value
+        self._metrics_idx += 1
+    
+    @property
+    def metrics_log(self) -> List[Dict]:
+        """Metrics history as one dict per collection point"""
+        columns = [self._metrics[name][:self._metrics_idx].tolist()
+                   for name, _ in self.METRICS_COLUMNS]
+        names = [name for name, _ in self.METRICS_COLUMNS]
+        return [dict(zip(names, row)) for row in zip(*columns)]
     
     def _finalize_metrics(self):
         """Compute final statistics"""
@@ -514,32 +987,37 @@ class DTNSimulator:
             self.logger.info(f"Average Latency: {final['avg_latency']:.2f}s")
             self.logger.info(f"Delivery Ratio: {final['delivery_ratio']:.2%}")
             self.logger.info(f"Avg Buffer Utilization: {final['avg_buffer_utilization']:.2f} bundles/node")
+        
+        # Put this run's buffered records on disk now rather than at exit
+        for handler in logging.getLogger().handlers:
+            handler.flush()
     
-    def generate_report(self, filename: str = "dtn_simulation_report.json"):
-        """Generate detailed simulation report"""
+    def generate_report(self, filename: Optional[str] = None) -> bytes:
+        """Generate detailed simulation report as JSON bytes, also written to filename if given"""
         report = {
-            'configuration': asdict(self.config),
+            'configuration': self.config,
             'execution_time': self.current_time,
             'metrics_timeline': self.metrics_log,
-            'node_statistics': [asdict(n.get_statistics(self.current_time)) for n in self.nodes],
+            'node_statistics': [n.get_statistics(self.current_time) for n in self.nodes],
             'contact_schedule': [
                 {
-                    'node_a': c.node_a,
-                    'node_b': c.node_b,
-                    'start_time': c.start_time,
-                    'end_time': c.end_time,
-                    'capacity_mbps': c.capacity,
-                    'reliability': c.reliability,
+                    'node_a': a,
+                    'node_b': b,
+                    'start_time': start,
+                    'end_time': end,
+                    'capacity_mbps': cap,
+                    'reliability': rel,
                 }
-                for c in self.contacts
+                for a, b, start, end, cap, rel in self.contact_table.rows()
             ]
         }
         
-        with open(filename, 'w') as f:
-            json.dump(report, f, indent=2)
-        
-        self.logger.info(f"Report generated: {filename}")
-        return report
+        data = _encode_json(report)
+        if filename is not None:
+            with open(filename, 'wb') as f:
+                f.write(data)
+            self.logger.info(f"Report generated: {filename}")
+        return data
 
 # ============================================================================
 # VISUALIZATION & ANALYSIS
@@ -578,9 +1056,10 @@ def print_simulation_summary(simulator: DTNSimulator):
                   f"avg latency {node.stats['total_latency']/node.stats['delivery_count']:.2f}s")
     
     print(f"\nNetwork Resilience:")
-    print(f"  Total Contacts: {len(simulator.contacts)}")
+    table = simulator.contact_table
+    print(f"  Total Contacts: {len(table)}")
     print(f"  Average Contact Duration: "
-          f"{sum(c.duration() for c in simulator.contacts) / len(simulator.contacts):.2f}s")
+          f"{np.mean(table.end_time - table.start_time):.2f}s")
     
     print("=" * 80 + "\n")
 
@@ -603,7 +1082,7 @@ if __name__ == "__main__":
     
     # Generate outputs
     print_simulation_summary(simulator)
-    report = simulator.generate_report("dtn_simulation_results.json")
+    simulator.generate_report("dtn_simulation_results.json")
     
     print("\n✓ Simulation complete!")
     print(f"✓ Log file: dtn_simulator.log")
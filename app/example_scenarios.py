@@ -6,16 +6,39 @@ Simple 3-node network demonstrating store-and-forward capability
 
 from DTN_LTP_Simulator import (
     SimulationConfig, DTNSimulator, DTNNode, Bundle, 
-    QoSLevel, Contact
+    QoSLevel, ContactTable
 )
+import contextlib
+import io
 import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+_BAR = "=" * 80
+_RULE = "-" * 80
+_BOX_TOP = "╔" + "=" * 78 + "╗"
+_BOX_MID = "║" + " " * 78 + "║"
+_BOX_BOT = "╚" + "=" * 78 + "╝"
+_BANNER = "\n".join([
+    "\n",
+    _BOX_TOP,
+    _BOX_MID,
+    "║" + "DTN-LTP SIMULATOR - USAGE EXAMPLES".center(78) + "║",
+    "║" + "Research Project for Dr. Xingya Liu".center(78) + "║",
+    _BOX_MID,
+    _BOX_BOT,
+    "",
+])
 
 def example_basic_network():
     """Run a simple 3-node DTN network"""
     
-    print("=" * 80)
+    print(_BAR)
     print("EXAMPLE 1: Basic 3-Node DTN Network")
-    print("=" * 80)
+    print(_BAR)
     print()
     print("Scenario: Three nodes in a line topology (0 <-> 1 <-> 2)")
     print("Node 0 sends a bundle to Node 2 via Node 1 (intermediate hop)")
@@ -33,27 +56,12 @@ def example_basic_network():
     simulator = DTNSimulator(config)
     
     # Manually create a simple contact schedule
-    # Node 0 contacts Node 1 at t=10s
-    contact_0_1 = Contact(
-        node_a=0,
-        node_b=1,
-        start_time=10.0,
-        end_time=20.0,
-        capacity=100.0,
-        reliability=0.99  # Very reliable
-    )
+    # (node_a, node_b, start_time, end_time, capacity, reliability)
+    contact_table = ContactTable()
+    contact_table.add(0, 1, 10.0, 20.0, 100.0, 0.99)  # Node 0 contacts Node 1 at t=10s
+    contact_table.add(1, 2, 30.0, 40.0, 100.0, 0.99)  # Node 1 contacts Node 2 at t=30s
     
-    # Node 1 contacts Node 2 at t=30s
-    contact_1_2 = Contact(
-        node_a=1,
-        node_b=2,
-        start_time=30.0,
-        end_time=40.0,
-        capacity=100.0,
-        reliability=0.99
-    )
-    
-    simulator.contacts = [contact_0_1, contact_1_2]
+    simulator.contact_table = contact_table
     
     # Manually inject bundle from Node 0 to Node 2
     bundle = Bundle(
@@ -77,17 +85,19 @@ def example_basic_network():
     
     # Print results
     print("\nSIMULATION RESULTS:")
-    print("-" * 80)
+    print(_RULE)
+    lines = []
     for i, node in enumerate(simulator.nodes):
         stats = node.get_statistics(simulator.current_time)
-        print(f"Node {i}:")
-        print(f"  Bundles Transmitted: {stats.bundles_transmitted}")
-        print(f"  Bundles Received:    {stats.bundles_received}")
-        print(f"  Bundles Dropped:     {stats.bundles_dropped}")
-        print(f"  Current Buffer:      {stats.buffer_size} bundles")
+        lines.append(f"Node {i}:\n"
+                     f"  Bundles Transmitted: {stats.bundles_transmitted}\n"
+                     f"  Bundles Received:    {stats.bundles_received}\n"
+                     f"  Bundles Dropped:     {stats.bundles_dropped}\n"
+                     f"  Current Buffer:      {stats.buffer_size} bundles\n")
         if stats.avg_latency > 0:
-            print(f"  Average Latency:     {stats.avg_latency:.2f}s")
-        print()
+            lines.append(f"  Average Latency:     {stats.avg_latency:.2f}s\n")
+        lines.append("\n")
+    print("".join(lines), end="")
     
     # Check if bundle reached destination
     if simulator.nodes[2].stats['delivery_count'] > 0:
@@ -95,7 +105,32 @@ def example_basic_network():
     else:
         print("✗ FAILURE: Bundle did not reach destination")
     
-    print("=" * 80)
+    print(_BAR)
+
+@lru_cache(maxsize=32)
+def _build_orbital_schedule(config: SimulationConfig, orbit_period: float,
+                            visible_duration: float, n_sats: int, reliability: float):
+    """Ground-station passes for satellites 1..n_sats, as read-only ContactTable columns"""
+    sat_ids = np.arange(1, n_sats + 1)
+    pass_starts = np.arange(4) * orbit_period + 20.0  # 4 orbits during 300s
+    pass_starts = pass_starts[pass_starts < config.simulation_time]
+    
+    # Every (satellite, pass) pair, satellite-major
+    sat_grid, start_grid = np.meshgrid(sat_ids, pass_starts, indexing='ij')
+    pass_ends = np.minimum(start_grid + visible_duration, config.simulation_time)
+    
+    num_passes = sat_grid.size
+    columns = (
+        np.zeros(num_passes, dtype=int),  # Ground station
+        sat_grid.ravel(),
+        start_grid.ravel(),
+        pass_ends.ravel(),
+        np.full(num_passes, config.channel_capacity),
+        np.full(num_passes, reliability),
+    )
+    for column in columns:
+        column.flags.writeable = False  # Shared between cache hits
+    return columns
 
 def example_space_communication():
     """
@@ -103,9 +138,9 @@ def example_space_communication():
     Multiple satellites with intermittent ground station contacts
     """
     
-    print("\n" + "=" * 80)
+    print("\n" + _BAR)
     print("EXAMPLE 2: Deep-Space Satellite Network")
-    print("=" * 80)
+    print(_BAR)
     print()
     print("Scenario: 3 satellites with periodic ground station passes")
     print("- Satellite orbital period: ~90 minutes")
@@ -124,54 +159,43 @@ def example_space_communication():
     
     simulator = DTNSimulator(config)
     
-    # Simulate orbital passes (ground station at node 0)
+    # Simulate orbital passes (ground station at node 0) for satellites 1, 2, 3
     orbit_period = 90.0  # seconds (simplified)
     visible_duration = 10.0
+    contact_table = ContactTable(*_build_orbital_schedule(
+        config, orbit_period, visible_duration, n_sats=3, reliability=0.98))
+    
+    simulator.contact_table = contact_table
     
-    contacts = []
-    for sat_id in range(1, 4):  # Satellites 1, 2, 3
-        for orbit in range(4):  # 4 orbits during 300s
-            pass_start = orbit * orbit_period + 20.0  # Pass starts
-            pass_end = pass_start + visible_duration
-            
-            if pass_start < config.simulation_time:
-                contact = Contact(
-                    node_a=0,  # Ground station
-                    node_b=sat_id,
-                    start_time=pass_start,
-                    end_time=min(pass_end, config.simulation_time),
-                    capacity=config.channel_capacity,
-                    reliability=0.98
-                )
-                contacts.append(contact)
-    
-    simulator.contacts = contacts
-    
-    print(f"Contact schedule generated: {len(contacts)} passes")
+    print(f"Contact schedule generated: {len(contact_table)} passes")
     print("Sample passes:")
-    for i, c in enumerate(contacts[:5]):
-        print(f"  Pass {i+1}: Sat {c.node_b} visible at t={c.start_time:.1f}s for {c.duration():.1f}s")
+    for i, (_, sat_id, start, end, _, _) in enumerate(contact_table.rows()):
+        if i == 5:
+            break
+        print(f"  Pass {i+1}: Sat {sat_id} visible at t={start:.1f}s for {end - start:.1f}s")
     
     # Run simulation
     simulator.run()
     
     # Analyze results
     print("\nSATELLITE STATISTICS:")
-    print("-" * 80)
+    print(_RULE)
+    lines = []
     for i in range(1, 4):
-        node = simulator.nodes[i]
-        print(f"Satellite {i}:")
-        print(f"  Bundles successfully relayed: {node.stats['bundles_transmitted']}")
-        print(f"  Bundles received from network: {node.stats['bundles_received']}")
-        print(f"  Bundles dropped (buffer full): {node.stats['bundles_dropped']}")
+        stats = simulator.nodes[i].stats
+        lines.append(f"Satellite {i}:\n"
+                     f"  Bundles successfully relayed: {stats['bundles_transmitted']}\n"
+                     f"  Bundles received from network: {stats['bundles_received']}\n"
+                     f"  Bundles dropped (buffer full): {stats['bundles_dropped']}\n")
     
     # Ground station statistics
-    ground = simulator.nodes[0]
-    print(f"\nGround Station (Node 0):")
-    print(f"  Bundles received: {ground.stats['bundles_received']}")
-    print(f"  Delivery success: {ground.stats['delivery_count']}")
+    ground = simulator.nodes[0].stats
+    lines.append(f"\nGround Station (Node 0):\n"
+                 f"  Bundles received: {ground['bundles_received']}\n"
+                 f"  Delivery success: {ground['delivery_count']}\n")
+    print("".join(lines), end="")
     
-    print("=" * 80)
+    print(_BAR)
 
 def example_qos_comparison():
     """
@@ -179,9 +203,9 @@ def example_qos_comparison():
     Generate critical vs. best-effort traffic and observe behavior under stress
     """
     
-    print("\n" + "=" * 80)
+    print("\n" + _BAR)
     print("EXAMPLE 3: QoS-Based Bundle Prioritization")
-    print("=" * 80)
+    print(_BAR)
     print()
     print("Scenario: Overloaded node receives mixed QoS traffic")
     print("Expected: CRITICAL bundles preserved, LOW-priority dropped first")
@@ -196,9 +220,10 @@ def example_qos_comparison():
     
     simulator = DTNSimulator(config)
     
-    # Create contact
-    contact = Contact(0, 1, 10.0, 40.0, 100.0, 0.95)
-    simulator.contacts = [contact]
+    # Create contact (replacing the generated schedule)
+    contact_table = ContactTable()
+    contact_table.add(0, 1, 10.0, 40.0, 100.0, 0.95)
+    simulator.contact_table = contact_table
     
     # Manually inject bundles with different QoS levels
     bundle_data = [
@@ -210,8 +235,8 @@ def example_qos_comparison():
         ("bundle_low_3", QoSLevel.LOW, 1000),  # One of these will drop
     ]
     
-    for bundle_id, qos, size in bundle_data:
-        bundle = Bundle(
+    simulator.nodes[0].receive_bundle_batch([
+        Bundle(
             bundle_id=bundle_id,
             source_id=0,
             destination_id=1,
@@ -220,7 +245,9 @@ def example_qos_comparison():
             deadline=50.0,
             qos_level=qos
         )
-        simulator.nodes[0].receive_bundle(bundle, 5.0)
+        for bundle_id, qos, size in bundle_data
+    ], 5.0)
+    for bundle_id, qos, _ in bundle_data:
         print(f"  Injected: {bundle_id} ({qos.name})")
     
     print()
@@ -234,17 +261,13 @@ def example_qos_comparison():
     
     # Check what was dropped
     print("RESULT:")
-    print("-" * 80)
+    print(_RULE)
     print(f"Bundles dropped: {simulator.nodes[0].stats['bundles_dropped']}")
     print(f"Bundles successfully buffered and transmitted: "
           f"{simulator.nodes[0].stats['bundles_transmitted']}")
     
     # Verify CRITICAL was preserved
-    node_0_buffer = simulator.nodes[0].bundle_buffer
-    critical_preserved = any(
-        b.qos_level == QoSLevel.CRITICAL 
-        for b in node_0_buffer.values()
-    )
+    critical_preserved = simulator.nodes[0].qos_counts[QoSLevel.CRITICAL.value] > 0
     
     if simulator.nodes[0].stats['bundles_dropped'] == 1:
         print("\n✓ Correct: Exactly 1 bundle dropped (buffer overflow)")
@@ -252,29 +275,35 @@ def example_qos_comparison():
     if not critical_preserved and simulator.nodes[0].stats['bundles_transmitted'] > 0:
         print("✓ Correct: CRITICAL bundle was prioritized for transmission")
     
-    print("=" * 80)
+    print(_BAR)
+
+def _run_captured(example) -> str:
+    """Run one example in a worker process and return what it printed"""
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            example()
+    finally:
+        # Workers exit without logging's atexit hook; write out buffered records
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+    return buffer.getvalue()
 
 def main():
     """Run all examples"""
     
-    print("\n")
-    print("╔" + "=" * 78 + "╗")
-    print("║" + " " * 78 + "║")
-    print("║" + "DTN-LTP SIMULATOR - USAGE EXAMPLES".center(78) + "║")
-    print("║" + "Research Project for Dr. Xingya Liu".center(78) + "║")
-    print("║" + " " * 78 + "║")
-    print("╚" + "=" * 78 + "╝")
-    print()
+    print(_BANNER)
     
-    # Run examples
-    example_basic_network()
-    example_space_communication()
-    example_qos_comparison()
+    # Examples share no state: run them side by side, then print in order
+    examples = [example_basic_network, example_space_communication, example_qos_comparison]
+    with ProcessPoolExecutor(max_workers=len(examples)) as executor:
+        for output in executor.map(_run_captured, examples):
+            print(output, end="")
     
     print("\n")
-    print("=" * 80)
+    print(_BAR)
     print("All examples completed successfully!")
-    print("=" * 80)
+    print(_BAR)
     print()
     print("Next steps:")
     print("1. Check dtn_simulator.log for detailed event logs")
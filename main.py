@@ -1,6 +1,11 @@
 
+import os
+
 import streamlit as st
-from app.DTN_LTP_Simulator import SimulationConfig, DTNSimulator
+
+# Keep Numba's compiled kernels under results/ so they survive app restarts
+# and the first "Run Simulation" click loads them instead of recompiling
+os.environ.setdefault("NUMBA_CACHE_DIR", os.path.join("results", "numba_cache"))
 
 st.set_page_config(page_title="DTN-LTP Simulator", layout="centered")
 st.title("🚀 DTN-LTP Cognitive Routing Simulator")
@@ -11,27 +16,34 @@ sim_time = st.sidebar.slider("Simulation Time (sec)", 100, 1000, 500)
 buffer_size = st.sidebar.slider("Max Buffer Size", 10, 200, 50)
 ltp_seg_size = st.sidebar.slider("LTP Segment Size (bytes)", 256, 4096, 1024)
 
+@st.cache_data(show_spinner=False)
+def run_sim(num_nodes, sim_time, buffer_size, ltp_seg_size) -> dict:
+    """Run one simulation; memoized per slider combination"""
+    # Imported on first run so slider reruns don't pay for numpy/numba
+    from app.DTN_LTP_Simulator import SimulationConfig, DTNSimulator
+    
+    config = SimulationConfig(
+        num_nodes=num_nodes,
+        simulation_time=sim_time,
+        max_buffer_size=buffer_size,
+        ltp_segment_size=ltp_seg_size,
+    )
+    simulator = DTNSimulator(config)
+    simulator.run()
+    return {'metrics': simulator.metrics_log, 'report_bytes': simulator.generate_report()}
+
 if st.button("Run Simulation"):
     with st.spinner("Running DTN Simulation..."):
-        config = SimulationConfig(
-            num_nodes=num_nodes,
-            simulation_time=sim_time,
-            max_buffer_size=buffer_size,
-            ltp_segment_size=ltp_seg_size,
-        )
-        simulator = DTNSimulator(config)
-        simulator.run()
-        report = simulator.generate_report("results/dtn_ui_results.json")
+        result = run_sim(num_nodes, sim_time, buffer_size, ltp_seg_size)
 
     st.success("Simulation Completed!")
     st.subheader("📊 Final Metrics")
-    final_metrics = simulator.metrics_log[-1]
+    final_metrics = result['metrics'][-1]
     st.json(final_metrics)
 
-    with open("results/dtn_ui_results.json", "rb") as f:
-        st.download_button(
-            label="📥 Download Report",
-            data=f,
-            file_name="dtn_simulation_results.json",
-            mime="application/json"
-        )
+    st.download_button(
+        label="📥 Download Report",
+        data=result['report_bytes'],
+        file_name="dtn_simulation_results.json",
+        mime="application/json"
+    )